@@ -1,14 +1,49 @@
 import pandas as pd
 import numpy as np
 from datetime import datetime
+import importlib.util
+import io
+import json
+import os
 import psycopg2
-from psycopg2.extras import execute_values
-import re
+
+# Regex patterns used by parse_harvest_csv (kept as plain strings - Arrow-backed
+# .str methods on pandas < 2.3 only accept str patterns, not re.Pattern)
+# Task patterns are matched against the lowercased task name
+CT_TASK_PATTERN = r'mastery:'
+VT_TASK_PATTERN = r'building projects: video'
+NT_TASK_PATTERN = r'networking|^nt'
+
+# Notes patterns are matched against the uppercased notes
+PRACTICE_NOTES_PATTERN = r'PRACTICE|^P[: ]'
+DEEP_DIVE_NOTES_PATTERN = r'DEEP DIVE|DL:|DL |DD:|DD '
+SHIPPING_NOTES_PATTERN = r'SHIPPING|^S[: ]'
+
+# Look for "Day X" or "day X" pattern (with or without space)
+DAY_NUMBER_PATTERN = r'[Dd]ay\s*(\d+)'
+
+# Arrow-backed strings run the .str matching below on Arrow buffers instead
+# of per-object Python calls; pyarrow is optional, so fall back to 'string'
+TEXT_DTYPE = 'string[pyarrow]' if importlib.util.find_spec('pyarrow') else 'string'
+
+# CT entries from this date on are tagged Deep Dive / Practice / Shipping
+CT_TYPE_CUTOFF = np.datetime64('2025-12-31', 'D')
+
+# Sidecar file recording which CSV the cached Parquet snapshot came from
+CACHE_SIGNATURE_FILE = '.cache_signature.json'
 
 # ============================================
 # STEP 1: EXTRACT & TRANSFORM
 # ============================================
 
+def text_contains(values, pattern, regex=True):
+    """
+    str.contains as a plain bool array - the nullable 'boolean' mask from a
+    string column isn't accepted by np.select on older pandas/numpy
+    """
+    return values.str.contains(pattern, regex=regex, na=False).to_numpy(dtype=bool)
+
+
 def parse_harvest_csv(filepath):
     """
     Parse Harvest CSV and categorize time entries
@@ -16,18 +51,18 @@ def parse_harvest_csv(filepath):
     Returns:
         df: Transformed DataFrame with new categorization columns
     """
-    # Read CSV
-    df = pd.read_csv(filepath)
-    
-    print(f"📊 Loaded {len(df)} records from Harvest CSV")
-    print(f"Date range: {df['Date'].min()} to {df['Date'].max()}")
-    
-    # Select only needed columns
+    # Read CSV - only the needed columns, typed up front so pandas
+    # doesn't infer (and then throw away) the Harvest billing columns
     columns_to_keep = ['Date', 'Task', 'Notes', 'Hours']
-    df = df[columns_to_keep].copy()
+    df = pd.read_csv(
+        filepath,
+        usecols=columns_to_keep,
+        dtype={'Task': TEXT_DTYPE, 'Notes': TEXT_DTYPE, 'Hours': 'float64'},
+        parse_dates=['Date']
+    )
     
-    # Convert date to proper format
-    df['Date'] = pd.to_datetime(df['Date'])
+    print(f"📊 Loaded {len(df)} records from Harvest CSV")
+    print(f"Date range: {df['Date'].min().date()} to {df['Date'].max().date()}")
     
     # ============================================
     # 100 DAYS CHALLENGE WEEK CALCULATION
@@ -41,38 +76,38 @@ def parse_harvest_csv(filepath):
     # Week 5: Jan 4 (Sun) - Jan 10 (Sat), Sabbath Jan 10
     
     CHALLENGE_START = pd.Timestamp('2025-12-07')  # Sunday, Dec 7, 2025
-    
-    def calculate_challenge_week(date):
-        """
-        Calculate week number based on challenge start date.
-        Week 1 starts Sunday Dec 7, 2025. Weeks are Sunday-Saturday.
-        """
-        if date < CHALLENGE_START:
-            # For dates before challenge, use regular Sunday-based weeks
-            # dayofweek: Monday=0, Sunday=6
-            days_since_sunday = (date.dayofweek + 1) % 7
-            week_start = date - pd.Timedelta(days=days_since_sunday)
-            # Use regular ISO week number for pre-challenge dates
-            week_number = date.isocalendar().week
-            return week_start, week_number
-        
-        # Calculate days since challenge start (Sunday Dec 7)
-        days_since_start = (date - CHALLENGE_START).days
-        
-        # Calculate which week (0-indexed, so add 1)
-        week_number = (days_since_start // 7) + 1
-        
-        # Calculate week start (always a Sunday)
-        # Week 1: Dec 7, Week 2: Dec 14, Week 3: Dec 21, etc.
-        week_start = CHALLENGE_START + pd.Timedelta(days=(week_number - 1) * 7)
-        
-        return week_start, week_number
-    
-    # Apply the calculation
-    df[['Week_Start', 'Week_Number']] = df['Date'].apply(
-        lambda x: pd.Series(calculate_challenge_week(x))
+
+    # Vectorized over the whole Date column (no per-row apply), using plain
+    # int64 day counts on the datetime64[D] values
+    dates = df['Date'].to_numpy(dtype='datetime64[D]')
+    challenge_start = np.datetime64(CHALLENGE_START.date(), 'D')
+    
+    # Calculate days since challenge start (Sunday Dec 7)
+    days_since_start = (dates - challenge_start).astype(np.int64)
+    pre_challenge = days_since_start < 0
+    
+    # Calculate which week (0-indexed, so add 1)
+    week_number = days_since_start // 7 + 1
+    if pre_challenge.any():
+        # Use regular ISO week number for pre-challenge dates
+        week_number[pre_challenge] = df.loc[pre_challenge, 'Date'].dt.isocalendar().week.to_numpy(dtype=np.int64)
+    
+    # Calculate week start (always a Sunday)
+    # Week 1: Dec 7, Week 2: Dec 14, Week 3: Dec 21, etc.
+    # For dates before challenge, use regular Sunday-based weeks
+    # (day 0 of the epoch, 1970-01-01, was a Thursday: 4 days after Sunday)
+    days_since_sunday = (dates.astype(np.int64) + 4) % 7
+    week_start = np.where(
+        pre_challenge,
+        dates - days_since_sunday,
+        challenge_start + (week_number - 1) * 7
     )
-    df['Year'] = df['Date'].dt.year
+    
+    df['Week_Start'] = week_start.astype(df['Date'].dtype)
+    # Nullable Int32 keeps these as real integers end to end (no float
+    # round-trip on the way to the INTEGER columns)
+    df['Week_Number'] = pd.array(week_number, dtype='Int32')
+    df['Year'] = df['Date'].dt.year.astype('Int32')
     
     # ============================================
     # CATEGORIZATION LOGIC
@@ -80,190 +115,218 @@ def parse_harvest_csv(filepath):
     
     # Create time_type column (CT or VT or Other)
     # IMPROVED: Case-insensitive matching that catches ALL MASTERY and BUILDING PROJECTS tasks
-    def categorize_time_type(task):
-        if pd.isna(task):
-            return 'Other'
-        
-        task_lower = task.lower()  # Convert to lowercase for case-insensitive matching
-        
-        # Check for any MASTERY task (catches all current and future MASTERY tasks)
-        if 'mastery:' in task_lower:
-            return 'CT'
-        # Check for any BUILDING PROJECTS: Video task
-        elif 'building projects: video' in task_lower:
-            return 'VT'
-        # just added this to check for networking tasks
-        elif 'networking' in task_lower or task_lower.startswith('nt'):
-            return 'NT'
-        else:
-            return 'Other'
-    
-    df['Time_Type'] = df['Task'].apply(categorize_time_type)
+    # Lowercase once for the whole column, then match in vectorized string ops
+    task_lower = df['Task'].str.lower()
+    
+    # Check for any MASTERY task (catches all current and future MASTERY tasks)
+    is_ct = text_contains(task_lower, CT_TASK_PATTERN)
+    # Check for any BUILDING PROJECTS: Video task
+    is_vt = text_contains(task_lower, VT_TASK_PATTERN)
+    # just added this to check for networking tasks
+    is_nt = text_contains(task_lower, NT_TASK_PATTERN)
+    
+    df['Time_Type'] = np.select([is_ct, is_vt, is_nt], ['CT', 'VT', 'NT'], default='Other')
+    
+    # Row masks for each type (first match wins, same as the select above),
+    # reused below instead of re-comparing the Time_Type column
+    ct_mask = is_ct
+    vt_mask = is_vt & ~is_ct
     
     # ============================================
     # CT CATEGORIZATION
     # ============================================
     
-    def categorize_ct_task(task):
-        """Categorize CT tasks by subject area - CASE INSENSITIVE"""
-        if pd.isna(task):
-            return None
-        
-        task_lower = task.lower()  # Convert to lowercase for case-insensitive matching
-        
-        if 'sql' in task_lower:
-            return 'SQL'
-        elif 'python' in task_lower:  # Catches both "Python Bootcamp" and "HackerRank Python"
-            return 'Python'
-        elif 'data engineering' in task_lower:
-            return 'Data_Engineering'
-        elif 'design' in task_lower or 'css' in task_lower or 'javascript' in task_lower:
-            return 'Design'
-        elif 'fode' in task_lower:
-            return 'FODE'
-        elif 'aws' in task_lower:
-            return 'AWS'
-        else:
-            return 'Uncategorized'
-    
-    df['CT_Category'] = df['Task'].apply(categorize_ct_task)
+    # Categorize CT tasks by subject area - CASE INSENSITIVE (first match wins)
+    ct_category = np.select(
+        [
+            text_contains(task_lower, 'sql', regex=False),
+            text_contains(task_lower, 'python', regex=False),  # Catches both "Python Bootcamp" and "HackerRank Python"
+            text_contains(task_lower, 'data engineering', regex=False),
+            text_contains(task_lower, 'design|css|javascript'),
+            text_contains(task_lower, 'fode', regex=False),
+            text_contains(task_lower, 'aws', regex=False),
+        ],
+        ['SQL', 'Python', 'Data_Engineering', 'Design', 'FODE', 'AWS'],
+        default='Uncategorized'
+    )
+    df['CT_Category'] = pd.Series(ct_category, index=df.index, dtype=object).where(df['Task'].notna(), None)
     
     # ============================================
     # CT SUB-CATEGORIZATION (Deep Dive vs Shipping)
     # ============================================
     
-    def categorize_ct_type(row):
-        """
-        Determine if CT is Deep Dive, Shipping, or Practice
-        Post 12/31/2025: Look for keywords in notes:
-        - DEEP DIVE / DL / DD → Deep_Dive
-        - SHIPPING / S → Shipping  
-        - PRACTICE / P → Practice
-        Pre 12/31/2025: Return 'Pre_Classification'
-        """
-        if row['Time_Type'] != 'CT':
-            return None
-        
-        if pd.isna(row['Notes']):
+    # Determine if CT is Deep Dive, Shipping, or Practice
+    # Post 12/31/2025: Look for keywords in notes:
+    # - DEEP DIVE / DL / DD → Deep_Dive
+    # - SHIPPING / S → Shipping
+    # - PRACTICE / P → Practice
+    # Pre 12/31/2025: 'Pre_Classification'
+    notes_upper = df['Notes'].str.upper()  # Convert to uppercase for easier matching
+    notes_missing = df['Notes'].isna()
+    post_cutoff = dates >= CT_TYPE_CUTOFF  # day values from the week calculation
+    
+    is_practice = text_contains(notes_upper, PRACTICE_NOTES_PATTERN)
+    is_deep_dive = text_contains(notes_upper, DEEP_DIVE_NOTES_PATTERN)
+    is_shipping = text_contains(notes_upper, SHIPPING_NOTES_PATTERN)
+    
+    df['CT_Type'] = np.select(
+        [
+            ~ct_mask,
+            # Pre 12/31 - mark for potential manual categorization
+            ~post_cutoff,
             # If no notes and it's after 12/31, default to Uncategorized
-            if row['Date'] >= pd.Timestamp('2025-12-31'):
-                return 'Uncategorized'
-            else:
-                return 'Pre_Classification'
-        
-        notes = str(row['Notes']).upper()  # Convert to uppercase for easier matching
-        
-        # Post 12/31 logic - look for explicit keywords
-        if row['Date'] >= pd.Timestamp('2025-12-31'):
+            notes_missing,
             # Check for PRACTICE first (most specific)
-            if 'PRACTICE' in notes or notes.startswith('P:') or notes.startswith('P '):
-                return 'Practice'
-            # Check for DEEP DIVE
-            elif 'DEEP DIVE' in notes or 'DL:' in notes or 'DL ' in notes or 'DD:' in notes or 'DD ' in notes:
-                return 'Deep_Dive'
-            # Check for SHIPPING
-            elif 'SHIPPING' in notes or notes.startswith('S:') or notes.startswith('S '):
-                return 'Shipping'
-            else:
-                return 'Uncategorized'
-        else:
-            # Pre 12/31 - mark for potential manual categorization
-            return 'Pre_Classification'
-    
-    df['CT_Type'] = df.apply(categorize_ct_type, axis=1)
+            is_practice,
+            is_deep_dive,
+            is_shipping,
+        ],
+        [None, 'Pre_Classification', 'Uncategorized', 'Practice', 'Deep_Dive', 'Shipping'],
+        default='Uncategorized'
+    )
     
     # ============================================
     # VT CATEGORIZATION
     # ============================================
     
-    def categorize_vt_task(task):
-        """Categorize VT tasks by video activity type"""
-        if pd.isna(task):
-            return None
-        
-        task_lower = task.lower()
-
-        if 'filming' in task_lower:
-            return 'Filming'
-        elif 'script' in task_lower:
-            return 'Scripting'
-        elif 'editing' in task_lower:
-            return 'Editing'
-        else:
-            return None
-    
-    df['VT_Category'] = df['Task'].apply(categorize_vt_task)
+    # Categorize VT tasks by video activity type (first match wins)
+    df['VT_Category'] = np.select(
+        [
+            text_contains(task_lower, 'filming', regex=False),
+            text_contains(task_lower, 'script', regex=False),
+            text_contains(task_lower, 'editing', regex=False),
+        ],
+        ['Filming', 'Scripting', 'Editing'],
+        default=None
+    )
 
     # ============================================
     # NT CATEGORIZATION
     # ============================================
 
-
-
-    def categorize_nt_task(task):
-        if pd.isna(task):
-            return None
-
-        task_lower = task.lower()
-
-        if 'messaging' in task_lower or 'linkedin' in task_lower:
-            return 'digital'
-        elif 'informational' in task_lower or 'chat' in task_lower:
-            return '1on1'
-        else:
-            return 'Pre_Classification'
-
-
-    df['NT_Category'] = df['Task'].apply(categorize_nt_task)
+    nt_category = np.select(
+        [
+            text_contains(task_lower, 'messaging|linkedin'),
+            text_contains(task_lower, 'informational|chat'),
+        ],
+        ['digital', '1on1'],
+        default='Pre_Classification'
+    )
+    df['NT_Category'] = pd.Series(nt_category, index=df.index, dtype=object).where(df['Task'].notna(), None)
 
 
     # ============================================
     # EXTRACT DAY NUMBER FROM VT NOTES
     # ============================================
     
-    def extract_day_number(row):
-        """
-        Extract day number from VT task or notes
-        Examples: "Day 7", "day 7", "day7", "Day7"
-        """
-        if row['Time_Type'] != 'VT':
-            return None
-        
-        # Check both Task and Notes
-        text_to_search = str(row['Task']) + ' ' + str(row['Notes'])
-        
-        if pd.isna(text_to_search):
-            return None
-        
-        # Look for "Day X" or "day X" pattern (with or without space)
-        match = re.search(r'[Dd]ay\s*(\d+)', text_to_search)
-        if match:
-            return int(match.group(1))
-        
-        return None
+    # Extract day number from VT task or notes
+    # Examples: "Day 7", "day 7", "day7", "Day7"
+    # Check both Task and Notes
+    text_to_search = (df.loc[vt_mask, 'Task'].fillna('') + ' '
+                      + df.loc[vt_mask, 'Notes'].fillna(''))
     
-    df['Day_Number'] = df.apply(extract_day_number, axis=1)
+    day_numbers = text_to_search.str.extract(DAY_NUMBER_PATTERN, expand=False)
+    # Int32 rather than float64 so non-VT rows hold <NA> instead of NaN
+    df['Day_Number'] = pd.to_numeric(day_numbers, errors='coerce').astype('Int32').reindex(df.index)
     
     # Clean up Notes column (keep original but add cleaned version)
     df['Notes_Clean'] = df['Notes'].fillna('').str.strip()
     
     # Add derived columns for easier analysis
-    df['Month'] = df['Date'].dt.to_period('M')
+    df['Month'] = df['Date'].dt.strftime('%Y-%m')
     df['Day_of_Week'] = df['Date'].dt.day_name()
     
+    # Low-cardinality label columns -> category dtype
+    # (comparisons and groupbys then run on small integer codes)
+    for col in ['Time_Type', 'CT_Category', 'VT_Category', 'NT_Category', 'CT_Type', 'Month', 'Day_of_Week']:
+        df[col] = df[col].astype('category')
+    
+    # One pass over the column for all four counts
+    type_counts = df['Time_Type'].value_counts()
+    
     print(f"\n✅ Transformation complete:")
-    print(f"   - CT entries: {len(df[df['Time_Type'] == 'CT'])}")
-    print(f"   - VT entries: {len(df[df['Time_Type'] == 'VT'])}")
-    print(f"   - NT entries: {len(df[df['Time_Type'] == 'NT'])}")
-    print(f"   - Other entries: {len(df[df['Time_Type'] == 'Other'])}")
+    print(f"   - CT entries: {type_counts.get('CT', 0)}")
+    print(f"   - VT entries: {type_counts.get('VT', 0)}")
+    print(f"   - NT entries: {type_counts.get('NT', 0)}")
+    print(f"   - Other entries: {type_counts.get('Other', 0)}")
     
     return df
 
 
+def cache_signature(filepath):
+    """
+    Fingerprint of the Harvest CSV (and this script, so code changes
+    also invalidate the cache)
+    """
+    csv_stat = os.stat(filepath)
+    return {
+        'csv_mtime': csv_stat.st_mtime,
+        'csv_size': csv_stat.st_size,
+        'etl_mtime': os.path.getmtime(__file__)
+    }
+
+
+def save_cache_signature(filepath, outputs_dir):
+    """
+    Record which CSV the Parquet snapshot in outputs_dir was built from
+    """
+    with open(os.path.join(outputs_dir, CACHE_SIGNATURE_FILE), 'w') as f:
+        json.dump(cache_signature(filepath), f)
+
+
+def load_cached_transform(filepath, outputs_dir):
+    """
+    Load the transformed DataFrame from the Parquet snapshot
+    
+    Returns:
+        df: Cached DataFrame, or None if the CSV changed since the snapshot
+            was written (or there is no usable snapshot)
+    """
+    parquet_path = os.path.join(outputs_dir, 'harvest_transformed.parquet')
+    
+    try:
+        with open(os.path.join(outputs_dir, CACHE_SIGNATURE_FILE)) as f:
+            if json.load(f) != cache_signature(filepath):
+                return None
+        df = pd.read_parquet(parquet_path)
+    except (OSError, ValueError, ImportError):
+        return None
+    
+    print(f"♻️  Harvest CSV unchanged - loaded {len(df)} transformed records from {parquet_path}")
+    return df
+
+
 # ============================================
 # STEP 2: GENERATE SUMMARY STATISTICS
 # ============================================
 
+def aggregate_weekly_hours(df):
+    """
+    Sum hours once per week and category combination
+    
+    The weekly, CT and VT summaries accept this rollup in place of the full
+    DataFrame, so the raw entries are only scanned by one groupby
+    """
+    return df.groupby(
+        ['Week_Start', 'Time_Type', 'CT_Category', 'VT_Category', 'CT_Type'],
+        observed=True, dropna=False
+    )['Hours'].sum().reset_index()
+
+
+def format_ratio(*percentages):
+    """
+    Join percentage columns into 'a:b' (or 'a:b:c') ratio strings
+    
+    Percentages are truncated to whole numbers like int() did before.
+    NaN becomes 0, so callers should mask those rows themselves
+    """
+    parts = [np.nan_to_num(np.asarray(p, dtype=np.float64)).astype(np.int64).astype(str) for p in percentages]
+    ratio = parts[0]
+    for part in parts[1:]:
+        ratio = np.char.add(np.char.add(ratio, ':'), part)
+    return ratio
+
+
 def generate_weekly_summary(df):
     """
     Generate weekly summary statistics with CT:VT:NT ratios
@@ -271,48 +334,48 @@ def generate_weekly_summary(df):
     print("\n📈 Generating weekly summary...")
 
     # Filter to include CT, VT, and NT (exclude 'Other')
-    df_filtered = df[df['Time_Type'].isin(['CT', 'VT', 'NT'])].copy()
+    df_filtered = df[df['Time_Type'].isin(['CT', 'VT', 'NT'])]
 
-    # Group by week and time type
-    weekly = df_filtered.groupby(['Week_Start', 'Time_Type']).agg({
-        'Hours': 'sum'
-    }).reset_index()
-
-    # Pivot to get CT, VT, and NT as columns
-    weekly_pivot = weekly.pivot(index='Week_Start', columns='Time_Type', values='Hours').fillna(0)
+    # Sum by week and pivot CT, VT, and NT into columns in one step
+    weekly_pivot = df_filtered.pivot_table(
+        index='Week_Start', columns='Time_Type', values='Hours',
+        aggfunc='sum', fill_value=0, observed=True
+    )
 
     # Ensure all columns exist (in case NT has no data)
     for col in ['CT', 'VT', 'NT']:
         if col not in weekly_pivot.columns:
             weekly_pivot[col] = 0.0
 
-    # Calculate total and ratios
-    weekly_pivot['Total_Hours'] = weekly_pivot[['CT', 'VT', 'NT']].sum(axis=1)
+    # Calculate total and ratios on one (weeks x 3) array
+    hours = weekly_pivot[['CT', 'VT', 'NT']].to_numpy(dtype=np.float64)
+    total_hours = hours.sum(axis=1)
+    weekly_pivot['Total_Hours'] = total_hours
 
     # Calculate percentages safely (handle zero total)
-    weekly_pivot['CT_Percentage'] = weekly_pivot.apply(
-        lambda row: round(row['CT'] / row['Total_Hours'] * 100, 1) if row['Total_Hours'] > 0 else 0.0, axis=1
-    )
-    weekly_pivot['VT_Percentage'] = weekly_pivot.apply(
-        lambda row: round(row['VT'] / row['Total_Hours'] * 100, 1) if row['Total_Hours'] > 0 else 0.0, axis=1
-    )
-    weekly_pivot['NT_Percentage'] = weekly_pivot.apply(
-        lambda row: round(row['NT'] / row['Total_Hours'] * 100, 1) if row['Total_Hours'] > 0 else 0.0, axis=1
-    )
+    has_hours = total_hours > 0
+    with np.errstate(divide='ignore', invalid='ignore'):
+        percentages = np.round(hours / total_hours[:, None] * 100, 1)
+    percentages[~has_hours] = 0.0
+    weekly_pivot[['CT_Percentage', 'VT_Percentage', 'NT_Percentage']] = percentages
 
     # Create CT:VT ratio (original format for backwards compatibility)
-    weekly_pivot['CT_VT_Ratio'] = weekly_pivot.apply(
-        lambda row: f"{int(row['CT_Percentage'])}:{int(row['VT_Percentage'])}" if row['Total_Hours'] > 0 else 'N/A', axis=1
+    weekly_pivot['CT_VT_Ratio'] = np.where(
+        has_hours,
+        format_ratio(weekly_pivot['CT_Percentage'], weekly_pivot['VT_Percentage']),
+        'N/A'
     )
 
     # Create CT:VT:NT ratio
-    weekly_pivot['CT_VT_NT_Ratio'] = weekly_pivot.apply(
-        lambda row: f"{int(row['CT_Percentage'])}:{int(row['VT_Percentage'])}:{int(row['NT_Percentage'])}" if row['Total_Hours'] > 0 else 'N/A', axis=1
+    weekly_pivot['CT_VT_NT_Ratio'] = np.where(
+        has_hours,
+        format_ratio(weekly_pivot['CT_Percentage'], weekly_pivot['VT_Percentage'], weekly_pivot['NT_Percentage']),
+        'N/A'
     )
 
-    # Reset index to make Week_Start a column
+    # Reset index to make Week_Start a column (left as datetime64 - midnight
+    # timestamps still print and export as plain YYYY-MM-DD dates)
     weekly_pivot = weekly_pivot.reset_index()
-    weekly_pivot['Week_Start'] = weekly_pivot['Week_Start'].dt.date
 
     return weekly_pivot
 
@@ -323,39 +386,36 @@ def generate_ct_breakdown(df):
     """
     print("\n📊 Generating CT category breakdown...")
     
-    ct_df = df[df['Time_Type'] == 'CT'].copy()
+    ct_df = df[df['Time_Type'] == 'CT']
     
     if len(ct_df) == 0:
         print("   ⚠️  No CT entries found")
         return pd.DataFrame(), pd.DataFrame()
     
     # By category (SQL, Python, Data Engineering, etc.)
-    ct_category = ct_df.groupby(['Week_Start', 'CT_Category']).agg({
+    ct_category = ct_df.groupby(['Week_Start', 'CT_Category'], observed=True).agg({
         'Hours': 'sum'
     }).reset_index()
-    ct_category['Week_Start'] = ct_category['Week_Start'].dt.date
     
     # By type (Deep Dive vs Shipping) - only for post 12/31 data
-    ct_type = ct_df[ct_df['Date'] >= '2025-12-31'].groupby(['Week_Start', 'CT_Type']).agg({
-        'Hours': 'sum'
-    }).reset_index()
+    # (pre 12/31 CT entries are exactly the 'Pre_Classification' ones)
+    ct_type_pivot = ct_df[ct_df['CT_Type'] != 'Pre_Classification'].pivot_table(
+        index='Week_Start', columns='CT_Type', values='Hours',
+        aggfunc='sum', fill_value=0, observed=True
+    )
+    ct_type = pd.DataFrame()
     
-    if len(ct_type) > 0:
-        ct_type['Week_Start'] = ct_type['Week_Start'].dt.date
-        
+    if len(ct_type_pivot) > 0:
         # Calculate Deep Dive vs Shipping ratio
-        ct_type_pivot = ct_type.pivot(index='Week_Start', columns='CT_Type', values='Hours').fillna(0)
-        
         if 'Deep_Dive' in ct_type_pivot.columns and 'Shipping' in ct_type_pivot.columns:
             ct_type_pivot['Total_CT'] = ct_type_pivot['Deep_Dive'] + ct_type_pivot['Shipping']
             ct_type_pivot['DD_Percentage'] = (ct_type_pivot['Deep_Dive'] / ct_type_pivot['Total_CT'] * 100).round(1)
             ct_type_pivot['S_Percentage'] = (ct_type_pivot['Shipping'] / ct_type_pivot['Total_CT'] * 100).round(1)
-            # Handle NaN values before converting to int
-            ct_type_pivot['DD_S_Ratio'] = ct_type_pivot.apply(
-                lambda row: f"{int(row['DD_Percentage'])}:{int(row['S_Percentage'])}" 
-                if pd.notna(row['DD_Percentage']) and pd.notna(row['S_Percentage']) 
-                else 'N/A', 
-                axis=1
+            # Handle NaN values (weeks with no Deep Dive/Shipping hours)
+            ct_type_pivot['DD_S_Ratio'] = np.where(
+                ct_type_pivot['DD_Percentage'].notna() & ct_type_pivot['S_Percentage'].notna(),
+                format_ratio(ct_type_pivot['DD_Percentage'], ct_type_pivot['S_Percentage']),
+                'N/A'
             )
         
         ct_type = ct_type_pivot.reset_index()
@@ -369,16 +429,15 @@ def generate_vt_breakdown(df):
     """
     print("\n🎥 Generating VT category breakdown...")
     
-    vt_df = df[df['Time_Type'] == 'VT'].copy()
+    vt_df = df[df['Time_Type'] == 'VT']
     
     if len(vt_df) == 0:
         print("   ⚠️  No VT entries found")
         return pd.DataFrame()
     
-    vt_category = vt_df.groupby(['Week_Start', 'VT_Category']).agg({
+    vt_category = vt_df.groupby(['Week_Start', 'VT_Category'], observed=True).agg({
         'Hours': 'sum'
     }).reset_index()
-    vt_category['Week_Start'] = vt_category['Week_Start'].dt.date
     
     return vt_category
 
@@ -390,7 +449,7 @@ def generate_100_days_progress(df):
     print("\n🎯 Generating 100 Days progress...")
     
     # Filter to entries with day numbers
-    days_df = df[df['Day_Number'].notna()].copy()
+    days_df = df[df['Day_Number'].notna()]
     
     if len(days_df) == 0:
         print("   ⚠️  No day numbers found in VT entries")
@@ -443,10 +502,34 @@ def create_harvest_table(conn):
     );
     
     CREATE INDEX IF NOT EXISTS idx_date ON harvest_time_tracking(date);
-    CREATE INDEX IF NOT EXISTS idx_week_start ON harvest_time_tracking(week_start);
-    CREATE INDEX IF NOT EXISTS idx_time_type ON harvest_time_tracking(time_type);
-    CREATE INDEX IF NOT EXISTS idx_ct_category ON harvest_time_tracking(ct_category);
-    CREATE INDEX IF NOT EXISTS idx_day_number ON harvest_time_tracking(day_number);
+    CREATE INDEX IF NOT EXISTS idx_ct_category ON harvest_time_tracking(ct_category) WHERE ct_category IS NOT NULL;
+    CREATE INDEX IF NOT EXISTS idx_day_number ON harvest_time_tracking(day_number) WHERE day_number IS NOT NULL;
+    CREATE INDEX IF NOT EXISTS idx_challenge_week ON harvest_time_tracking(week_start DESC, time_type)
+        INCLUDE (week_number, hours, ct_category, ct_type, vt_category, day_number);
+    
+    -- Superseded by idx_challenge_week (week_start leads it) and too
+    -- unselective on their own; dropping them saves upkeep on every upsert
+    DROP INDEX IF EXISTS idx_week_start;
+    DROP INDEX IF EXISTS idx_time_type;
+    
+    -- Persistent staging table from older loads (now a per-load temp table)
+    DROP TABLE IF EXISTS public.harvest_staging;
+    
+    -- Weekly rollup read by the dashboard (refreshed after every load)
+    CREATE MATERIALIZED VIEW IF NOT EXISTS weekly_summary_mv AS
+    SELECT 
+        week_number,
+        week_start,
+        SUM(CASE WHEN time_type = 'CT' THEN hours ELSE 0 END) as ct_hours,
+        SUM(CASE WHEN time_type = 'VT' THEN hours ELSE 0 END) as vt_hours,
+        SUM(CASE WHEN time_type = 'NT' THEN hours ELSE 0 END) as nt_hours,
+        SUM(hours) as total_hours  -- WHERE already limits this to CT/VT/NT
+    FROM harvest_time_tracking
+    WHERE time_type IN ('CT', 'VT', 'NT')
+      AND week_start >= '2025-12-07'
+    GROUP BY week_number, week_start;
+    
+    CREATE UNIQUE INDEX IF NOT EXISTS idx_weekly_summary_mv_week ON weekly_summary_mv(week_start);
     """
     
     with conn.cursor() as cur:
@@ -456,6 +539,18 @@ def create_harvest_table(conn):
     print("✅ Table created/verified successfully")
 
 
+def refresh_weekly_summary(conn):
+    """
+    Rebuild the dashboard's weekly rollup from the freshly loaded rows
+    """
+    with conn.cursor() as cur:
+        # CONCURRENTLY keeps the view readable by the dashboard meanwhile
+        cur.execute("REFRESH MATERIALIZED VIEW CONCURRENTLY weekly_summary_mv;")
+        conn.commit()
+    
+    print("✅ Weekly summary rollup refreshed")
+
+
 def load_to_postgres(df, conn, truncate=False):
     """
     Load transformed dataframe to PostgreSQL
@@ -476,51 +571,50 @@ def load_to_postgres(df, conn, truncate=False):
         'Date', 'Week_Start', 'Week_Number', 'Year', 'Month',
         'Day_of_Week', 'Task', 'Notes_Clean', 'Hours',
         'Time_Type', 'CT_Category', 'VT_Category', 'NT_Category', 'CT_Type', 'Day_Number'
-    ]].copy()
+    ]]
+    
+    # One row per (date, task, notes) key - a repeated key would make the
+    # upsert (or the unique index, after a truncate) reject the whole batch.
+    # The later entry wins, as it did with the old per-row upsert
+    row_count = len(df_subset)
+    df_subset = df_subset.drop_duplicates(subset=['Date', 'Task', 'Notes_Clean'], keep='last')
+    if len(df_subset) < row_count:
+        print(f"   ⚠️  Merged {row_count - len(df_subset)} duplicate entries (same date, task and notes)")
     
-    # Convert Period to string for Month column
-    df_subset['Month'] = df_subset['Month'].astype(str)
+    # Both paths stream the rows with COPY instead of a parsed multi-row INSERT
+    buffer = io.StringIO()
+    df_subset.to_csv(buffer, index=False, header=False, na_rep='\\N')
+    buffer.seek(0)
     
-    # Convert integer columns FIRST (while NaN detection works)
-    for col in ['Week_Number', 'Year', 'Day_Number']:
-        if col in df_subset.columns:
-            df_subset[col] = df_subset[col].apply(
-                lambda x: int(x) if pd.notna(x) else None
+    columns = """date, week_start, week_number, year, month, day_of_week,
+     task, notes, hours, time_type, ct_category, vt_category, nt_category, ct_type, day_number"""
+    
+    if truncate:
+        # Table was just emptied, so nothing can conflict - COPY straight in
+        with conn.cursor() as cur:
+            cur.copy_expert(
+                f"COPY harvest_time_tracking ({columns}) FROM STDIN WITH (FORMAT CSV, NULL '\\N')",
+                buffer
             )
+            conn.commit()
+        
+        print(f"✅ Copied {len(df_subset)} rows to PostgreSQL")
+        return
+    
+    # COPY into a temp staging table, then upsert set-based on the server.
+    # LIKE picks up the current table definition on every run, and the
+    # table is dropped again when the transaction commits
+    staging_query = """
+    CREATE TEMP TABLE harvest_staging
+    (LIKE harvest_time_tracking INCLUDING DEFAULTS)
+    ON COMMIT DROP;
+    """
     
-    # NUCLEAR OPTION: Build list manually row by row
-    # This is the ONLY way to prevent pandas from converting None back to NaN
-    import numpy as np
-    
-    def to_python_type(val):
-        """Convert numpy types to Python native types for psycopg2"""
-        if pd.isna(val):
-            return None
-        elif isinstance(val, (np.integer, np.int64, np.int32)):
-            return int(val)
-        elif isinstance(val, (np.floating, np.float64, np.float32)):
-            return float(val)
-        elif isinstance(val, np.bool_):
-            return bool(val)
-        elif isinstance(val, np.str_):
-            return str(val)
-        else:
-            return val
-    
-    values = []
-    for idx in range(len(df_subset)):
-        row = []
-        for col in df_subset.columns:
-            val = df_subset[col].iloc[idx]
-            row.append(to_python_type(val))
-        values.append(tuple(row))
-    
-    # Insert query with ON CONFLICT to handle duplicates
-    insert_query = """
+    upsert_query = f"""
     INSERT INTO harvest_time_tracking
-    (date, week_start, week_number, year, month, day_of_week,
-     task, notes, hours, time_type, ct_category, vt_category, nt_category, ct_type, day_number)
-    VALUES %s
+    ({columns})
+    SELECT {columns}
+    FROM harvest_staging
     ON CONFLICT (date, task, notes) DO UPDATE SET
         hours = EXCLUDED.hours,
         time_type = EXCLUDED.time_type,
@@ -531,11 +625,17 @@ def load_to_postgres(df, conn, truncate=False):
         day_number = EXCLUDED.day_number
     """
     
+    # One transaction: staging, COPY and upsert commit (or roll back) together
     with conn.cursor() as cur:
-        execute_values(cur, insert_query, values)
+        cur.execute(staging_query)
+        cur.copy_expert(
+            f"COPY harvest_staging ({columns}) FROM STDIN WITH (FORMAT CSV, NULL '\\N')",
+            buffer
+        )
+        cur.execute(upsert_query)
         conn.commit()
     
-    print(f"✅ Loaded/updated {len(values)} rows to PostgreSQL")
+    print(f"✅ Loaded/updated {len(df_subset)} rows to PostgreSQL")
 
 
 # ============================================
@@ -572,8 +672,6 @@ def main():
     print("STEP 1: EXTRACT & TRANSFORM")
     print("="*60)
     
-    df = parse_harvest_csv(HARVEST_CSV_PATH)
-    
     # Save transformed CSV for inspection (optional - only if outputs dir exists or can be created)
     script_dir = os.path.dirname(__file__)
     outputs_dir = os.path.join(script_dir, 'outputs')
@@ -587,10 +685,23 @@ def main():
         save_outputs = False
         print("\n⚠️  Outputs directory not available - skipping CSV exports (database loading will continue)")
     
-    if save_outputs:
-        output_csv = os.path.join(outputs_dir, 'harvest_transformed.csv')
-        df.to_csv(output_csv, index=False)
-        print(f"\n✅ Transformed CSV saved to: {output_csv}")
+    # Reuse the last run's Parquet snapshot if the Harvest CSV hasn't changed
+    df = load_cached_transform(HARVEST_CSV_PATH, outputs_dir) if save_outputs else None
+    
+    if df is None:
+        df = parse_harvest_csv(HARVEST_CSV_PATH)
+        
+        if save_outputs:
+            # Parquet keeps the column dtypes and skips the slow text writer;
+            # fall back to CSV when pyarrow isn't installed
+            try:
+                output_path = os.path.join(outputs_dir, 'harvest_transformed.parquet')
+                df.to_parquet(output_path, index=False, compression='zstd')
+                save_cache_signature(HARVEST_CSV_PATH, outputs_dir)
+            except ImportError:
+                output_path = os.path.join(outputs_dir, 'harvest_transformed.csv')
+                df.to_csv(output_path, index=False)
+            print(f"\n✅ Transformed data saved to: {output_path}")
     
     # ============================================
     # STEP 2: GENERATE SUMMARIES
@@ -599,8 +710,11 @@ def main():
     print("STEP 2: GENERATE SUMMARIES")
     print("="*60)
     
+    # Aggregate hours once; the weekly/CT/VT summaries slice this rollup
+    weekly_hours = aggregate_weekly_hours(df)
+    
     # Weekly CT:VT summary
-    weekly_summary = generate_weekly_summary(df)
+    weekly_summary = generate_weekly_summary(weekly_hours)
     if save_outputs:
         weekly_csv = os.path.join(outputs_dir, 'weekly_summary.csv')
         weekly_summary.to_csv(weekly_csv, index=False)
@@ -610,7 +724,7 @@ def main():
         print(f"\n✅ Saved to: {weekly_csv}")
     
     # CT breakdown by category
-    ct_category, ct_type = generate_ct_breakdown(df)
+    ct_category, ct_type = generate_ct_breakdown(weekly_hours)
     if len(ct_category) > 0:
         if save_outputs:
             ct_cat_csv = os.path.join(outputs_dir, 'ct_category_breakdown.csv')
@@ -630,7 +744,7 @@ def main():
             print(f"\n✅ Saved to: {ct_type_csv}")
     
     # VT breakdown
-    vt_category = generate_vt_breakdown(df)
+    vt_category = generate_vt_breakdown(weekly_hours)
     if len(vt_category) > 0:
         if save_outputs:
             vt_cat_csv = os.path.join(outputs_dir, 'vt_category_breakdown.csv')
@@ -666,6 +780,7 @@ def main():
         
         # Load data (set truncate=True to clear existing data first)
         load_to_postgres(df, conn, truncate=False)
+        refresh_weekly_summary(conn)
         
         conn.close()
         print("✅ Database operations completed")
@@ -683,7 +798,7 @@ def main():
     print("✨ PIPELINE COMPLETE!")
     print("="*60)
     print("\nGenerated files:")
-    print("  1. harvest_transformed.csv - Full transformed dataset")
+    print("  1. harvest_transformed.parquet - Full transformed dataset (.csv without pyarrow)")
     print("  2. weekly_summary.csv - Weekly CT:VT ratios")
     print("  3. ct_category_breakdown.csv - CT by subject (SQL, Python, etc.)")
     print("  4. ct_type_breakdown.csv - Deep Dive vs Shipping breakdown")
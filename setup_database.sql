@@ -33,14 +33,41 @@ CREATE TABLE harvest_time_tracking (
 );
 
 -- Create indexes for faster queries
+-- (week_start lookups use idx_challenge_week below; time_type alone has
+-- too few distinct values to be worth its own index)
 CREATE INDEX idx_date ON harvest_time_tracking(date);
-CREATE INDEX idx_week_start ON harvest_time_tracking(week_start);
-CREATE INDEX idx_time_type ON harvest_time_tracking(time_type);
 CREATE INDEX idx_ct_category ON harvest_time_tracking(ct_category) WHERE ct_category IS NOT NULL;
 CREATE INDEX idx_ct_type ON harvest_time_tracking(ct_type) WHERE ct_type IS NOT NULL;
 CREATE INDEX idx_day_number ON harvest_time_tracking(day_number) WHERE day_number IS NOT NULL;
 CREATE INDEX idx_year_week ON harvest_time_tracking(year, week_number);
 
+-- Covering index for the dashboard's challenge-week rollups
+-- (week_start range + time_type filter answered by an index-only scan)
+CREATE INDEX idx_challenge_week ON harvest_time_tracking(week_start DESC, time_type)
+    INCLUDE (week_number, hours, ct_category, ct_type, vt_category, day_number);
+
+-- ============================================
+-- WEEKLY SUMMARY ROLLUP
+-- ============================================
+
+-- Pre-aggregated weekly hours for the dashboard; the ETL refreshes it
+-- after every load (REFRESH MATERIALIZED VIEW CONCURRENTLY weekly_summary_mv)
+CREATE MATERIALIZED VIEW weekly_summary_mv AS
+SELECT 
+    week_number,
+    week_start,
+    SUM(CASE WHEN time_type = 'CT' THEN hours ELSE 0 END) as ct_hours,
+    SUM(CASE WHEN time_type = 'VT' THEN hours ELSE 0 END) as vt_hours,
+    SUM(CASE WHEN time_type = 'NT' THEN hours ELSE 0 END) as nt_hours,
+    SUM(hours) as total_hours  -- WHERE already limits this to CT/VT/NT
+FROM harvest_time_tracking
+WHERE time_type IN ('CT', 'VT', 'NT')
+  AND week_start >= '2025-12-07'
+GROUP BY week_number, week_start;
+
+-- Unique index required for concurrent refreshes
+CREATE UNIQUE INDEX idx_weekly_summary_mv_week ON weekly_summary_mv(week_start);
+
 -- Add comments for documentation
 COMMENT ON TABLE harvest_time_tracking IS 'Main table for tracking time entries from Harvest app';
 COMMENT ON COLUMN harvest_time_tracking.time_type IS 'CT = Coding Time, VT = Video Time, Other = Everything else';
@@ -56,6 +83,7 @@ DO $$
 BEGIN
     RAISE NOTICE '✅ Database schema created successfully!';
     RAISE NOTICE 'Table created: harvest_time_tracking';
+    RAISE NOTICE 'Materialized view created: weekly_summary_mv';
     RAISE NOTICE 'Data types: week_number, year, day_number = BIGINT';
     RAISE NOTICE '';
     RAISE NOTICE 'Next steps:';
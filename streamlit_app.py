@@ -1,10 +1,18 @@
 import streamlit as st
 import pandas as pd
-import psycopg2
+import numpy as np
+from sqlalchemy import create_engine
+from sqlalchemy.engine import URL
+from sqlalchemy.exc import ProgrammingError
+from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
 import plotly.express as px
 import plotly.graph_objects as go
-from datetime import datetime, timedelta
+from datetime import date, datetime, timedelta
 import os
+import re
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor
+import threading
 
 # ============================================
 # PAGE CONFIGURATION
@@ -21,150 +29,200 @@ st.set_page_config(
 # DATABASE CONNECTION
 # ============================================
 
-def get_database_connection():
+@st.cache_resource
+def get_database_engine():
     """
-    Create PostgreSQL connection using Streamlit secrets for cloud deployment
+    Create one pooled PostgreSQL engine per server process using Streamlit
+    secrets for cloud deployment
     Falls back to environment variables for local development
     """
+    # Try Streamlit secrets first (for cloud deployment)
+    if hasattr(st, 'secrets') and 'database' in st.secrets:
+        db = st.secrets["database"]
+    # Fall back to environment variables (for local development)
+    else:
+        db = {
+            'dbname': os.getenv('DB_NAME', 'harvest_tracker'),
+            'user': os.getenv('DB_USER', 'fandy'),
+            'password': os.getenv('DB_PASSWORD', 'password'),
+            'host': os.getenv('DB_HOST', 'localhost'),
+            'port': os.getenv('DB_PORT', '5432')
+        }
+    
+    url = URL.create(
+        "postgresql+psycopg2",
+        username=db["user"],
+        password=db["password"],
+        host=db["host"],
+        port=int(db["port"]),
+        database=db["dbname"]
+    )
+    # Connections are reused across queries and reruns instead of a new
+    # TCP/auth handshake per loader; pre_ping drops ones the server closed
+    return create_engine(url, pool_size=5, max_overflow=10, pool_pre_ping=True)
+
+@contextmanager
+def get_database_connection():
+    """
+    Borrow a PostgreSQL connection from the pool (yields None if the
+    database can't be reached); it goes back to the pool on exit
+    """
     try:
-        # Try Streamlit secrets first (for cloud deployment)
-        if hasattr(st, 'secrets') and 'database' in st.secrets:
-            conn = psycopg2.connect(
-                dbname=st.secrets["database"]["dbname"],
-                user=st.secrets["database"]["user"],
-                password=st.secrets["database"]["password"],
-                host=st.secrets["database"]["host"],
-                port=st.secrets["database"]["port"]
-            )
-        # Fall back to environment variables (for local development)
-        else:
-            conn = psycopg2.connect(
-                dbname=os.getenv('DB_NAME', 'harvest_tracker'),
-                user=os.getenv('DB_USER', 'fandy'),
-                password=os.getenv('DB_PASSWORD', 'password'),
-                host=os.getenv('DB_HOST', 'localhost'),
-                port=os.getenv('DB_PORT', '5432')
-            )
-        return conn
+        conn = get_database_engine().connect()
     except Exception as e:
         st.error(f"❌ Database connection failed: {e}")
         st.info("💡 Make sure PostgreSQL is running and credentials are correct")
-        return None
+        yield None
+        return
+    
+    with conn:
+        yield conn
+
+# ============================================
+# QUERY PARAMETERS
+# ============================================
+
+# Bound as parameters instead of repeating date literals in every query
+QUERY_PARAMS = {
+    'challenge_start': date(2025, 12, 7),       # Day 1 of the challenge
+    'classification_start': date(2025, 12, 31)  # Deep Dive/Shipping tagging began
+}
+
+# ============================================
+# FRAME HELPERS
+# ============================================
+
+def round_half_up(values, decimals=0):
+    """Round like Postgres ROUND() on NUMERIC (halves go up, not to even)"""
+    factor = 10 ** decimals
+    return np.floor(values * factor + 0.5) / factor
+
+def format_ratio(*percentages):
+    """Join whole-number percentages as 'a:b[:c]' (missing ones stay blank, like SQL CONCAT)"""
+    parts = [round_half_up(pct).astype('Int64').astype('string').fillna('') for pct in percentages]
+    return parts[0].str.cat(parts[1:], sep=':').astype(str)
+
+def downcast_integers(df, *columns):
+    """Shrink int64 count/number columns to the smallest integer type that fits"""
+    for col in columns:
+        df[col] = pd.to_numeric(df[col], downcast='integer')
+    return df
 
 # ============================================
 # DATA LOADING FUNCTIONS
 # ============================================
 
-@st.cache_data(ttl=300)  # Cache for 5 minutes
+@st.cache_data(ttl=300, max_entries=32, show_spinner=False)  # Cache for 5 minutes
 def load_weekly_summary():
     """Load weekly CT:VT summary for 100 Days Challenge"""
-    conn = get_database_connection()
-    if conn is None:
-        return pd.DataFrame()
-    
+    # Pre-aggregated by the ETL after every load
     query = """
-    SELECT 
-        week_number,
-        week_start,
-        SUM(CASE WHEN time_type = 'CT' THEN hours ELSE 0 END) as ct_hours,
-        SUM(CASE WHEN time_type = 'VT' THEN hours ELSE 0 END) as vt_hours,
-        SUM(CASE WHEN time_type = 'NT' THEN hours ELSE 0 END) as nt_hours,
-        SUM(CASE WHEN time_type IN ('CT', 'VT', 'NT') THEN hours ELSE 0 END) as total_hours,
-        ROUND(
-            SUM(CASE WHEN time_type = 'CT' THEN hours ELSE 0 END) / 
-            NULLIF(SUM(CASE WHEN time_type IN ('CT', 'VT') THEN hours ELSE 0 END), 0) * 100, 
-            1
-        ) as ct_percentage,
-        ROUND(
-            SUM(CASE WHEN time_type = 'VT' THEN hours ELSE 0 END) / 
-            NULLIF(SUM(CASE WHEN time_type IN ('CT', 'VT') THEN hours ELSE 0 END), 0) * 100, 
-            1
-        ) as vt_percentage,
-        CONCAT(
-            ROUND(SUM(CASE WHEN time_type = 'CT' THEN hours ELSE 0 END) / 
-                  NULLIF(SUM(CASE WHEN time_type IN ('CT', 'VT') THEN hours ELSE 0 END), 0) * 100), 
-            ':', 
-            ROUND(SUM(CASE WHEN time_type = 'VT' THEN hours ELSE 0 END) / 
-                  NULLIF(SUM(CASE WHEN time_type IN ('CT', 'VT') THEN hours ELSE 0 END), 0) * 100)
-        ) as ct_vt_ratio
-    FROM harvest_time_tracking
-    WHERE time_type IN ('CT', 'VT', 'NT')
-      AND week_start >= '2025-12-07'  -- Only show challenge weeks
-    GROUP BY week_number, week_start
+    SELECT week_number, week_start, ct_hours, vt_hours, nt_hours, total_hours
+    FROM weekly_summary_mv
     ORDER BY week_start DESC
     LIMIT 20
     """
     
-    df = pd.read_sql_query(query, conn)
-    conn.close()
+    # Same rollup computed live, for databases the ETL hasn't upgraded yet.
+    # The 20 latest weeks are picked first so only their entries get summed
+    fallback_query = """
+    WITH recent_weeks AS (
+        SELECT DISTINCT week_number, week_start
+        FROM harvest_time_tracking
+        WHERE time_type IN ('CT', 'VT', 'NT')
+          AND week_start >= %(challenge_start)s  -- Only show challenge weeks
+        ORDER BY week_start DESC
+        LIMIT 20
+    )
+    SELECT 
+        rw.week_number,
+        rw.week_start,
+        SUM(CASE WHEN h.time_type = 'CT' THEN h.hours ELSE 0 END) as ct_hours,
+        SUM(CASE WHEN h.time_type = 'VT' THEN h.hours ELSE 0 END) as vt_hours,
+        SUM(CASE WHEN h.time_type = 'NT' THEN h.hours ELSE 0 END) as nt_hours,
+        SUM(h.hours) as total_hours  -- join already limits this to CT/VT/NT
+    FROM recent_weeks rw
+    JOIN harvest_time_tracking h
+      ON h.week_start = rw.week_start
+     AND h.week_number = rw.week_number
+     AND h.time_type IN ('CT', 'VT', 'NT')
+    GROUP BY rw.week_number, rw.week_start
+    ORDER BY rw.week_start DESC
+    """
+    
+    with get_database_connection() as conn:
+        if conn is None:
+            return pd.DataFrame()
+        try:
+            df = pd.read_sql_query(query, conn)
+        except (ProgrammingError, pd.errors.DatabaseError):
+            # pandas 3 wraps the driver's ProgrammingError in its own DatabaseError
+            conn.rollback()
+            df = pd.read_sql_query(fallback_query, conn, params=QUERY_PARAMS)
+    
+    if df.empty:
+        return df
+    
+    downcast_integers(df, 'week_number')
+    
+    # Derive the percentages/ratio once over the (<= 20 row) result instead
+    # of repeating the CASE sums per expression in SQL
+    ct_vt_hours = (df['ct_hours'] + df['vt_hours']).replace(0, np.nan)
+    ct_share = df['ct_hours'] / ct_vt_hours * 100
+    vt_share = df['vt_hours'] / ct_vt_hours * 100
+    df['ct_percentage'] = round_half_up(ct_share, 1)
+    df['vt_percentage'] = round_half_up(vt_share, 1)
+    df['ct_vt_ratio'] = format_ratio(ct_share, vt_share)
     return df
 
-@st.cache_data(ttl=300)
-def load_ct_breakdown():
-    """Load coding time breakdown by category and type"""
-    conn = get_database_connection()
-    if conn is None:
-        return pd.DataFrame()
-    
+@st.cache_data(ttl=300, max_entries=32, show_spinner=False)
+def load_ct_by_category():
+    """Load total coding time per subject area"""
     query = """
     SELECT 
-        week_start,
-        week_number,
         ct_category,
-        ct_type,
-        SUM(hours) as hours,
-        COUNT(*) as entry_count
+        SUM(hours) as hours
     FROM harvest_time_tracking
     WHERE time_type = 'CT'
-      AND week_start >= '2025-12-07'  -- Only challenge weeks
-    GROUP BY week_start, week_number, ct_category, ct_type
-    ORDER BY week_start DESC, hours DESC
+      AND ct_category IS NOT NULL
+      AND week_start >= %(challenge_start)s  -- Only challenge weeks
+    GROUP BY ct_category
+    ORDER BY hours DESC, ct_category
     """
     
-    df = pd.read_sql_query(query, conn)
-    conn.close()
-    return df
+    with get_database_connection() as conn:
+        if conn is None:
+            return pd.DataFrame()
+        return pd.read_sql_query(query, conn, params=QUERY_PARAMS)
 
-@st.cache_data(ttl=300)
-def load_vt_breakdown():
-    """Load video time breakdown"""
-    conn = get_database_connection()
-    if conn is None:
-        return pd.DataFrame()
-    
+@st.cache_data(ttl=300, max_entries=32, show_spinner=False)
+def load_vt_by_category():
+    """Load total video time per activity"""
     query = """
-    SELECT
-        week_start,
-        week_number,
+    SELECT 
         vt_category,
-        day_number,
-        SUM(hours) as hours,
-        COUNT(*) as entry_count
+        SUM(hours) as hours
     FROM harvest_time_tracking
     WHERE time_type = 'VT'
-      AND week_start >= '2025-12-07'  -- Only challenge weeks
-    GROUP BY week_start, week_number, vt_category, day_number
-    ORDER BY week_start DESC, day_number
+      AND vt_category IS NOT NULL
+      AND week_start >= %(challenge_start)s  -- Only challenge weeks
+    GROUP BY vt_category
+    ORDER BY hours, vt_category
     """
+    
+    with get_database_connection() as conn:
+        if conn is None:
+            return pd.DataFrame()
+        return pd.read_sql_query(query, conn, params=QUERY_PARAMS)
 
-    df = pd.read_sql_query(query, conn)
-    conn.close()
-    return df
-
-@st.cache_data(ttl=300)
+@st.cache_data(ttl=300, max_entries=32, show_spinner=False)
 def load_100_days_progress():
     """Load 100 Days challenge progress"""
-    conn = get_database_connection()
-    if conn is None:
-        return pd.DataFrame()
-    
     query = """
     SELECT 
         day_number,
         MIN(date) as first_date,
-        SUM(hours) as total_hours_on_day,
-        100 - CAST(day_number AS INTEGER) as days_remaining,
-        ROUND(CAST(day_number AS DECIMAL) / 100 * 100, 1) as progress_percentage
+        SUM(hours) as total_hours_on_day
     FROM harvest_time_tracking
     WHERE day_number IS NOT NULL
       AND time_type = 'VT'
@@ -172,46 +230,46 @@ def load_100_days_progress():
     ORDER BY day_number
     """
     
-    df = pd.read_sql_query(query, conn)
-    conn.close()
+    with get_database_connection() as conn:
+        if conn is None:
+            return pd.DataFrame()
+        df = pd.read_sql_query(query, conn)
+    
+    downcast_integers(df, 'day_number')
+    
+    # Simple per-row arithmetic - cheaper here than as casts in SQL
+    df['days_remaining'] = 100 - df['day_number']
+    df['progress_percentage'] = df['day_number'].astype('float64')  # day N of 100 = N%
     return df
 
-@st.cache_data(ttl=300)
+@st.cache_data(ttl=300, max_entries=32, show_spinner=False)
 def load_current_week_stats():
-    """Load current week statistics"""
-    conn = get_database_connection()
-    if conn is None:
-        return pd.DataFrame()
-    
+    """Load current week hours per time type"""
+    # Latest week resolved once in a CTE; filtering on week_start (not date)
+    # lets MAX() come straight off the week_start index. Only the per-type
+    # totals are shown, so sum them here instead of shipping every entry
     query = """
-    SELECT 
-        date,
-        task,
-        time_type,
-        hours,
-        ct_category,
-        vt_category,
-        day_number
-    FROM harvest_time_tracking
-    WHERE week_start = (
-        SELECT MAX(week_start) 
+    WITH latest_week AS (
+        SELECT MAX(week_start) as week_start
         FROM harvest_time_tracking 
-        WHERE date >= '2025-12-07'
+        WHERE week_start >= %(challenge_start)s
     )
-    ORDER BY date DESC, hours DESC
+    SELECT 
+        h.time_type,
+        SUM(h.hours) as hours
+    FROM harvest_time_tracking h
+    JOIN latest_week l ON h.week_start = l.week_start
+    GROUP BY h.time_type
     """
     
-    df = pd.read_sql_query(query, conn)
-    conn.close()
-    return df
+    with get_database_connection() as conn:
+        if conn is None:
+            return pd.DataFrame()
+        return pd.read_sql_query(query, conn, params=QUERY_PARAMS)
 
-@st.cache_data(ttl=300)
+@st.cache_data(ttl=300, max_entries=32, show_spinner=False)
 def load_dd_vs_shipping():
     """Load Deep Dive vs Shipping vs Practice breakdown"""
-    conn = get_database_connection()
-    if conn is None:
-        return pd.DataFrame()
-    
     query = """
     SELECT 
         week_start,
@@ -219,36 +277,36 @@ def load_dd_vs_shipping():
         SUM(CASE WHEN ct_type = 'Deep_Dive' THEN hours ELSE 0 END) as deep_dive_hours,
         SUM(CASE WHEN ct_type = 'Shipping' THEN hours ELSE 0 END) as shipping_hours,
         SUM(CASE WHEN ct_type = 'Practice' THEN hours ELSE 0 END) as practice_hours,
-        SUM(CASE WHEN ct_type IN ('Deep_Dive', 'Shipping', 'Practice') THEN hours ELSE 0 END) as total_categorized,
-        CONCAT(
-            ROUND(SUM(CASE WHEN ct_type = 'Deep_Dive' THEN hours ELSE 0 END) / 
-                  NULLIF(SUM(CASE WHEN ct_type IN ('Deep_Dive', 'Shipping', 'Practice') THEN hours ELSE 0 END), 0) * 100),
-            ':',
-            ROUND(SUM(CASE WHEN ct_type = 'Shipping' THEN hours ELSE 0 END) / 
-                  NULLIF(SUM(CASE WHEN ct_type IN ('Deep_Dive', 'Shipping', 'Practice') THEN hours ELSE 0 END), 0) * 100),
-            ':',
-            ROUND(SUM(CASE WHEN ct_type = 'Practice' THEN hours ELSE 0 END) / 
-                  NULLIF(SUM(CASE WHEN ct_type IN ('Deep_Dive', 'Shipping', 'Practice') THEN hours ELSE 0 END), 0) * 100)
-        ) as dd_ship_practice_ratio
+        SUM(hours) as total_categorized  -- WHERE already limits ct_type
     FROM harvest_time_tracking
     WHERE time_type = 'CT'
-      AND date >= '2025-12-31'  -- Only after classification started
+      AND date >= %(classification_start)s  -- Only after classification started
       AND ct_type IN ('Deep_Dive', 'Shipping', 'Practice')
     GROUP BY week_start, week_number
     ORDER BY week_start DESC
     """
     
-    df = pd.read_sql_query(query, conn)
-    conn.close()
+    with get_database_connection() as conn:
+        if conn is None:
+            return pd.DataFrame()
+        df = pd.read_sql_query(query, conn, params=QUERY_PARAMS)
+    
+    if df.empty:
+        return df
+    
+    downcast_integers(df, 'week_number')
+    
+    total_categorized = df['total_categorized'].replace(0, np.nan)
+    df['dd_ship_practice_ratio'] = format_ratio(
+        df['deep_dive_hours'] / total_categorized * 100,
+        df['shipping_hours'] / total_categorized * 100,
+        df['practice_hours'] / total_categorized * 100
+    )
     return df
 
-@st.cache_data(ttl=300)
+@st.cache_data(ttl=300, max_entries=32, show_spinner=False)
 def load_day_of_week_averages():
     """Load average hours by day of week"""
-    conn = get_database_connection()
-    if conn is None:
-        return pd.DataFrame()
-    
     query = """
     SELECT 
         day_of_week,
@@ -265,7 +323,7 @@ def load_day_of_week_averages():
             SUM(CASE WHEN time_type = 'CT' THEN hours ELSE 0 END) as daily_ct,
             SUM(CASE WHEN time_type = 'VT' THEN hours ELSE 0 END) as daily_vt
         FROM harvest_time_tracking
-        WHERE date >= '2025-12-07'  -- Only challenge period
+        WHERE date >= %(challenge_start)s  -- Only challenge period
           AND day_of_week != 'Saturday'  -- Exclude Sabbath
         GROUP BY date, day_of_week
     ) daily_stats
@@ -282,44 +340,83 @@ def load_day_of_week_averages():
         END
     """
     
-    df = pd.read_sql_query(query, conn)
-    conn.close()
-    return df
+    with get_database_connection() as conn:
+        if conn is None:
+            return pd.DataFrame()
+        return pd.read_sql_query(query, conn, params=QUERY_PARAMS)
 
-@st.cache_data(ttl=60)  # Cache for 1 minute (more frequent updates)
+@st.cache_data(ttl=60, max_entries=32, show_spinner=False)  # Cache for 1 minute (more frequent updates)
 def load_today_stats():
     """Load today's hours so far"""
-    conn = get_database_connection()
-    if conn is None:
-        return None
-    
-    from datetime import date
     today = date.today()
     
     query = """
     SELECT 
         day_of_week,
-        SUM(CASE WHEN time_type IN ('CT', 'VT') THEN hours ELSE 0 END) as total_hours,
-        SUM(CASE WHEN time_type = 'CT' THEN hours ELSE 0 END) as ct_hours,
-        SUM(CASE WHEN time_type = 'VT' THEN hours ELSE 0 END) as vt_hours
+        SUM(CASE WHEN time_type IN ('CT', 'VT') THEN hours ELSE 0 END)::float8 as total_hours,
+        SUM(CASE WHEN time_type = 'CT' THEN hours ELSE 0 END)::float8 as ct_hours,
+        SUM(CASE WHEN time_type = 'VT' THEN hours ELSE 0 END)::float8 as vt_hours
     FROM harvest_time_tracking
     WHERE date = %s
     GROUP BY day_of_week
     """
     
-    df = pd.read_sql_query(query, conn, params=(today,))
-    conn.close()
+    with get_database_connection() as conn:
+        if conn is None:
+            return None
+        # Single row - fetch it as a dict instead of building a DataFrame
+        # (float8 casts so the sums come back as floats, not Decimals)
+        row = conn.exec_driver_sql(query, (today,)).mappings().first()
     
-    if df.empty:
-        return None
+    return dict(row) if row is not None else None
+
+@st.cache_data(ttl=300, max_entries=32, show_spinner=False)
+def load_days_completed():
+    """Load the number of challenge days logged so far (Sabbaths excluded)"""
+    query = """
+    SELECT COUNT(DISTINCT date) as days_completed
+    FROM harvest_time_tracking
+    WHERE date >= %(challenge_start)s
+      AND time_type IN ('CT', 'VT')
+      AND day_of_week != 'Saturday'
+    """
     
-    return df.iloc[0].to_dict()
+    with get_database_connection() as conn:
+        if conn is None:
+            return None
+        # Single value - fetch the scalar instead of building a DataFrame
+        return int(conn.exec_driver_sql(query, QUERY_PARAMS).scalar() or 0)
+
+def load_dashboard_data():
+    """
+    Run the main page loaders concurrently, so cache misses overlap their
+    database round trips instead of queueing behind each other
+    """
+    loaders = [
+        load_weekly_summary,
+        load_ct_by_category,
+        load_vt_by_category,
+        load_100_days_progress,
+        load_current_week_stats,
+        load_dd_vs_shipping
+    ]
+    
+    # Worker threads need the script context so a connection error can
+    # still be shown on the page
+    ctx = get_script_run_ctx()
+    with ThreadPoolExecutor(
+        max_workers=len(loaders),
+        initializer=lambda: add_script_run_ctx(threading.current_thread(), ctx)
+    ) as executor:
+        futures = [executor.submit(loader) for loader in loaders]
+    
+    return [future.result() for future in futures]
 
 # ============================================
 # CUSTOM CSS
 # ============================================
 
-st.markdown("""
+CUSTOM_CSS = """
 <style>
     .code-editor {
         background-color: #1e1e1e;
@@ -387,13 +484,58 @@ st.markdown("""
         border-left-color: #ef4444;
     }
 </style>
-""", unsafe_allow_html=True)
+"""
+
+@st.cache_resource
+def inject_css():
+    """Emit the static CSS once; later reruns replay the cached element"""
+    st.markdown(CUSTOM_CSS, unsafe_allow_html=True)
+
+@st.cache_resource
+def get_preview_image():
+    """Path of the hero image, or None if it isn't deployed (checked once)"""
+    return 'preview.png' if os.path.exists('preview.png') else None
+
+# ============================================
+# CODE VIEWER
+# ============================================
+
+# One alternation instead of a replace() pass per token: strings come first
+# so keywords/comment markers inside them aren't re-wrapped, and each group
+# name doubles as the CSS class for the span
+CODE_TOKEN_PATTERN = re.compile(
+    r'(?P<string>"[^"]*"|\'[^\']*\')'
+    r'|(?P<comment>#.*)'
+    r'|(?P<keyword>\b(?:def|while|if|elif|else|break|return|True|False|import|from|in|not)\b)'
+    r'|(?P<function>\b(?:print|input|range|len|list|lower|keys|append|isalpha|choice|join|play_game)(?=\())'
+)
+
+def highlight_token(match):
+    """Wrap a matched token in the span for its group"""
+    return f'<span class="{match.lastgroup}">{match.group()}</span>'
+
+@st.cache_data(show_spinner=False)
+def highlight_code(code):
+    """Build the VS Code styled HTML for a code sample (cached per source)"""
+    code_lines = code.split('\n')
+    code_html = '<div class="code-editor" style="white-space: pre; font-family: \'Courier New\', monospace;">'
+    
+    for i, line in enumerate(code_lines, 1):
+        highlighted_line = line.replace('&', '&amp;').replace('<', '&lt;').replace('>', '&gt;')
+        highlighted_line = CODE_TOKEN_PATTERN.sub(highlight_token, highlighted_line)
+        
+        code_html += f'<div style="display: flex;"><span class="line-number">{i:>3}</span><span>{highlighted_line}</span></div>'
+    
+    code_html += '</div>'
+    return code_html
 
 # ============================================
 # MAIN APP
 # ============================================
 
 def main():
+    inject_css()
+    
     # ============================================
     # HERO IMAGE SECTION (For Featured App Thumbnail)
     # ============================================
@@ -401,8 +543,9 @@ def main():
     col1, col2, col3 = st.columns([1, 3, 1])
     with col2:
         
-        if os.path.exists('preview.png'):
-            st.image('preview.png', use_container_width=True)
+        preview_image = get_preview_image()
+        if preview_image:
+            st.image(preview_image, use_container_width=True)
     
     st.markdown("---")
 
@@ -413,23 +556,11 @@ def main():
     # ============================================
     
     # Get current day first (needed for header)
-    conn = get_database_connection()
-    if conn:
-        try:
-            query = """
-            SELECT COUNT(DISTINCT date) as days_completed
-            FROM harvest_time_tracking
-            WHERE date >= '2025-12-07'
-              AND time_type IN ('CT', 'VT')
-              AND day_of_week != 'Saturday'
-            """
-            days_df = pd.read_sql_query(query, conn)
-            current_day = int(days_df['days_completed'].iloc[0]) if not days_df.empty else 0
-        except:
-            current_day = 28  # Fallback
-        finally:
-            conn.close()
-    else:
+    try:
+        current_day = load_days_completed()
+    except:
+        current_day = None
+    if current_day is None:
         current_day = 28  # Fallback
     
     # Header with dynamic day count
@@ -501,26 +632,8 @@ def main():
         """)
     
     # Load data
-    weekly_summary = load_weekly_summary()
-    ct_breakdown = load_ct_breakdown()
-    vt_breakdown = load_vt_breakdown()
-    progress_100_days = load_100_days_progress()
-    current_week = load_current_week_stats()
-    dd_shipping = load_dd_vs_shipping()
-    
-    # Safety check: convert None to empty DataFrame
-    if weekly_summary is None:
-        weekly_summary = pd.DataFrame()
-    if ct_breakdown is None:
-        ct_breakdown = pd.DataFrame()
-    if vt_breakdown is None:
-        vt_breakdown = pd.DataFrame()
-    if progress_100_days is None:
-        progress_100_days = pd.DataFrame()
-    if current_week is None:
-        current_week = pd.DataFrame()
-    if dd_shipping is None:
-        dd_shipping = pd.DataFrame()
+    (weekly_summary, ct_by_category, vt_by_category,
+     progress_100_days, current_week, dd_shipping) = load_dashboard_data()
     
     # Check if data loaded successfully
     if weekly_summary.empty:
@@ -528,6 +641,10 @@ def main():
         st.code("python harvest_etl_pipeline.py", language="bash")
         return
     
+    # Most recent COMPLETED week (the first row is the current partial week),
+    # pulled out once for the overview comparison and the key metrics
+    last_week = weekly_summary.iloc[min(1, len(weekly_summary) - 1)].to_dict()
+    
     # ============================================
     # CURRENT WEEK OVERVIEW
     # ============================================
@@ -537,29 +654,17 @@ def main():
     if not current_week.empty:
         col1, col2, col3, col4, col5 = st.columns(5)
 
-        ct_this_week = current_week[current_week['time_type'] == 'CT']['hours'].sum()
-        vt_this_week = current_week[current_week['time_type'] == 'VT']['hours'].sum()
-        nt_this_week = current_week[current_week['time_type'] == 'NT']['hours'].sum()
+        hours_by_type = current_week.set_index('time_type')['hours']
+        ct_this_week = hours_by_type.get('CT', 0.0)
+        vt_this_week = hours_by_type.get('VT', 0.0)
+        nt_this_week = hours_by_type.get('NT', 0.0)
         total_this_week = ct_this_week + vt_this_week + nt_this_week
 
-        # Check if nt_hours column exists (for backwards compatibility)
-        has_nt_column = 'nt_hours' in weekly_summary.columns
-
-        # Get last week's data for comparison
-        if len(weekly_summary) >= 2:
-            last_week = weekly_summary.iloc[1]
-            ct_last_week = last_week['ct_hours']
-            vt_last_week = last_week['vt_hours']
-            nt_last_week = last_week['nt_hours'] if has_nt_column else 0
-        elif not weekly_summary.empty:
-            last_week = weekly_summary.iloc[0]
-            ct_last_week = last_week['ct_hours']
-            vt_last_week = last_week['vt_hours']
-            nt_last_week = last_week['nt_hours'] if has_nt_column else 0
-        else:
-            ct_last_week = 0
-            vt_last_week = 0
-            nt_last_week = 0
+        # Get last week's data for comparison (nt_hours may be missing
+        # for backwards compatibility)
+        ct_last_week = last_week['ct_hours']
+        vt_last_week = last_week['vt_hours']
+        nt_last_week = last_week.get('nt_hours', 0)
 
         # Handle NaN values (convert to 0)
         nt_last_week = 0 if pd.isna(nt_last_week) else nt_last_week
@@ -746,52 +851,23 @@ def main():
     
     col1, col2, col3, col4 = st.columns(4)
     
-    # Get the most recent COMPLETED week (not current partial week)
-    # Week 5 (Jan 4-10) is current/incomplete, so show Week 4 (Dec 28-Jan 3)
-    if len(weekly_summary) >= 2:
-        latest_complete_week = weekly_summary.iloc[1]  # Second row is most recent complete week
-    elif not weekly_summary.empty:
-        latest_complete_week = weekly_summary.iloc[0]
-    else:
-        latest_complete_week = None
-    
     with col1:
-        if latest_complete_week is not None:
-            st.metric(
-                "Last Week Total",
-                f"{latest_complete_week['total_hours']:.1f} hrs",
-                help="Total hours logged last completed week"
-            )
+        st.metric(
+            "Last Week Total",
+            f"{last_week['total_hours']:.1f} hrs",
+            help="Total hours logged last completed week"
+        )
     
     with col2:
-        if latest_complete_week is not None:
-            ratio_status = "✅" if 60 <= latest_complete_week['ct_percentage'] <= 80 else "⚠️"
-            st.metric(
-                f"{ratio_status} Last Week Ratio",
-                latest_complete_week['ct_vt_ratio'],
-                help="Target: 70:30 CT:VT"
-            )
+        ratio_status = "✅" if 60 <= last_week['ct_percentage'] <= 80 else "⚠️"
+        st.metric(
+            f"{ratio_status} Last Week Ratio",
+            last_week['ct_vt_ratio'],
+            help="Target: 70:30 CT:VT"
+        )
     
     with col3:
-        # This calculate actual challenge days (excluding Sabbaths)
-        try:
-            conn = get_database_connection()
-            if conn:
-                query = """
-                SELECT COUNT(DISTINCT date) as days_completed
-                FROM harvest_time_tracking
-                WHERE date >= '2025-12-07'
-                  AND time_type IN ('CT', 'VT')
-                  AND day_of_week NOT IN ('Saturday')
-                """
-                days_df = pd.read_sql_query(query, conn)
-                conn.close()
-                current_day = int(days_df['days_completed'].iloc[0])
-            else:
-                current_day = 10  # Fallback
-        except:
-            current_day = 10  # Fallback
-            
+        # Actual challenge days (excluding Sabbaths) - loaded once for the header
         st.metric(
             "Days Completed",
             f"{current_day}/100",
@@ -800,7 +876,7 @@ def main():
     
     with col4:
         if not dd_shipping.empty and 'dd_ship_practice_ratio' in dd_shipping.columns:
-            latest_ratio = dd_shipping.iloc[0]['dd_ship_practice_ratio']
+            latest_ratio = dd_shipping['dd_ship_practice_ratio'].iat[0]
             if latest_ratio and latest_ratio != 'nan:nan:nan':
                 st.metric(
                     "Learn:Practice:Ship",
@@ -840,34 +916,33 @@ def main():
         weekly_display['nt_hours'] = weekly_display['nt_hours'].fillna(0)
 
         # Create labels with week numbers
-        weekly_display['week_label'] = weekly_display.apply(
-            lambda row: f"Week {int(row['week_number'])}<br>{row['week_start'].strftime('%b %d')}",
-            axis=1
+        weekly_display['week_label'] = (
+            "Week " + weekly_display['week_number'].astype(int).astype(str)
+            + "<br>" + pd.to_datetime(weekly_display['week_start']).dt.strftime('%b %d')
         )
 
-        fig = go.Figure()
-
-        fig.add_trace(go.Bar(
-            name='Coding Time',
-            x=weekly_display['week_label'],
-            y=weekly_display['ct_hours'],
-            marker_color='#667eea',
-            text=weekly_display['ct_hours'].round(1),
-            textposition='inside'
-        ))
-
-        fig.add_trace(go.Bar(
-            name='Video Time',
-            x=weekly_display['week_label'],
-            y=weekly_display['vt_hours'],
-            marker_color='#764ba2',
-            text=weekly_display['vt_hours'].round(1),
-            textposition='inside'
-        ))
+        traces = [
+            go.Bar(
+                name='Coding Time',
+                x=weekly_display['week_label'],
+                y=weekly_display['ct_hours'],
+                marker_color='#667eea',
+                text=weekly_display['ct_hours'].round(1),
+                textposition='inside'
+            ),
+            go.Bar(
+                name='Video Time',
+                x=weekly_display['week_label'],
+                y=weekly_display['vt_hours'],
+                marker_color='#764ba2',
+                text=weekly_display['vt_hours'].round(1),
+                textposition='inside'
+            )
+        ]
 
         # Add NT bar only if there's any NT data
         if weekly_display['nt_hours'].sum() > 0:
-            fig.add_trace(go.Bar(
+            traces.append(go.Bar(
                 name='Networking Time',
                 x=weekly_display['week_label'],
                 y=weekly_display['nt_hours'],
@@ -876,52 +951,65 @@ def main():
                 textposition='inside'
             ))
 
-        # Add target line at 70% CT
-        fig.add_hline(
-            y=weekly_display['total_hours'].mean() * 0.7,
-            line_dash="dash",
-            line_color="green",
-            annotation_text="70% CT Target",
-            annotation_position="right"
-        )
+        # Target line at 70% CT, as a layout shape rather than add_hline
+        ct_target = weekly_display['total_hours'].mean() * 0.7
 
-        fig.update_layout(
-            barmode='stack',
-            title="Weekly Time Distribution (CT: Coding, VT: Video, NT: Networking)",
-            xaxis_title="Week",
-            yaxis_title="Hours",
-            height=400,
-            hovermode='x unified'
+        fig = go.Figure(
+            data=traces,
+            layout=dict(
+                barmode='stack',
+                title="Weekly Time Distribution (CT: Coding, VT: Video, NT: Networking)",
+                xaxis_title="Week",
+                yaxis_title="Hours",
+                height=400,
+                hovermode='x unified',
+                shapes=[dict(
+                    type='line',
+                    xref='x domain', x0=0, x1=1,
+                    yref='y', y0=ct_target, y1=ct_target,
+                    line=dict(color='green', dash='dash')
+                )],
+                annotations=[dict(
+                    text="70% CT Target",
+                    xref='x domain', x=1, xanchor='left',
+                    yref='y', y=ct_target, yanchor='middle',
+                    showarrow=False
+                )]
+            )
         )
 
         st.plotly_chart(fig, use_container_width=True)
         
         # Show CT:VT ratio trend
-        fig_ratio = go.Figure()
-        
-        fig_ratio.add_trace(go.Scatter(
-            x=weekly_display['week_start'],
-            y=weekly_display['ct_percentage'],
-            mode='lines+markers',
-            name='CT Percentage',
-            line=dict(color='#667eea', width=3),
-            marker=dict(size=10)
-        ))
-        
-        # Add target zone
-        fig_ratio.add_hrect(
-            y0=60, y1=80,
-            fillcolor="green", opacity=0.1,
-            annotation_text="Target Zone (60-80%)",
-            annotation_position="left"
-        )
-        
-        fig_ratio.update_layout(
-            title="CT Percentage Trend (Target: 70%)",
-            xaxis_title="Week Starting",
-            yaxis_title="CT Percentage",
-            height=300,
-            yaxis=dict(range=[0, 100])
+        fig_ratio = go.Figure(
+            data=[go.Scatter(
+                x=weekly_display['week_start'],
+                y=weekly_display['ct_percentage'],
+                mode='lines+markers',
+                name='CT Percentage',
+                line=dict(color='#667eea', width=3),
+                marker=dict(size=10)
+            )],
+            layout=dict(
+                title="CT Percentage Trend (Target: 70%)",
+                xaxis_title="Week Starting",
+                yaxis_title="CT Percentage",
+                height=300,
+                yaxis=dict(range=[0, 100]),
+                # Target zone
+                shapes=[dict(
+                    type='rect',
+                    xref='x domain', x0=0, x1=1,
+                    yref='y', y0=60, y1=80,
+                    fillcolor="green", opacity=0.1
+                )],
+                annotations=[dict(
+                    text="Target Zone (60-80%)",
+                    xref='x domain', x=0, xanchor='left',
+                    yref='y', y=70, yanchor='middle',
+                    showarrow=False
+                )]
+            )
         )
         
         st.plotly_chart(fig_ratio, use_container_width=True)
@@ -938,11 +1026,7 @@ def main():
     
     with col1:
         st.markdown("### By Subject Area")
-        if not ct_breakdown.empty:
-            # Aggregate by category
-            ct_by_category = ct_breakdown.groupby('ct_category')['hours'].sum().reset_index()
-            ct_by_category = ct_by_category.sort_values('hours', ascending=False)
-            
+        if not ct_by_category.empty:
             fig_ct = px.pie(
                 ct_by_category,
                 values='hours',
@@ -959,47 +1043,46 @@ def main():
             # Get recent weeks
             dd_ship_display = dd_shipping.head(weeks_to_show).sort_values('week_start')
             
-            fig_dd = go.Figure()
-            
-            fig_dd.add_trace(go.Bar(
-                name='Deep Dive',
-                x=dd_ship_display['week_start'],
-                y=dd_ship_display['deep_dive_hours'],
-                marker_color='#3b82f6',
-                text=dd_ship_display['deep_dive_hours'].round(1),
-                textposition='inside'
-            ))
-            
-            fig_dd.add_trace(go.Bar(
-                name='Practice',
-                x=dd_ship_display['week_start'],
-                y=dd_ship_display['practice_hours'],
-                marker_color='#f59e0b',
-                text=dd_ship_display['practice_hours'].round(1),
-                textposition='inside'
-            ))
-            
-            fig_dd.add_trace(go.Bar(
-                name='Shipping',
-                x=dd_ship_display['week_start'],
-                y=dd_ship_display['shipping_hours'],
-                marker_color='#10b981',
-                text=dd_ship_display['shipping_hours'].round(1),
-                textposition='inside'
-            ))
-            
-            fig_dd.update_layout(
-                barmode='stack',
-                title='Coding Time Breakdown<br><sub>Deep Dive (Learn) | Practice (HackerRank/LeetCode) | Shipping (Build)</sub>',
-                xaxis_title='Week Starting',
-                yaxis_title='Hours',
-                height=400,
-                legend=dict(
-                    orientation="h",
-                    yanchor="bottom",
-                    y=1.02,
-                    xanchor="right",
-                    x=1
+            fig_dd = go.Figure(
+                data=[
+                    go.Bar(
+                        name='Deep Dive',
+                        x=dd_ship_display['week_start'],
+                        y=dd_ship_display['deep_dive_hours'],
+                        marker_color='#3b82f6',
+                        text=dd_ship_display['deep_dive_hours'].round(1),
+                        textposition='inside'
+                    ),
+                    go.Bar(
+                        name='Practice',
+                        x=dd_ship_display['week_start'],
+                        y=dd_ship_display['practice_hours'],
+                        marker_color='#f59e0b',
+                        text=dd_ship_display['practice_hours'].round(1),
+                        textposition='inside'
+                    ),
+                    go.Bar(
+                        name='Shipping',
+                        x=dd_ship_display['week_start'],
+                        y=dd_ship_display['shipping_hours'],
+                        marker_color='#10b981',
+                        text=dd_ship_display['shipping_hours'].round(1),
+                        textposition='inside'
+                    )
+                ],
+                layout=dict(
+                    barmode='stack',
+                    title='Coding Time Breakdown<br><sub>Deep Dive (Learn) | Practice (HackerRank/LeetCode) | Shipping (Build)</sub>',
+                    xaxis_title='Week Starting',
+                    yaxis_title='Hours',
+                    height=400,
+                    legend=dict(
+                        orientation="h",
+                        yanchor="bottom",
+                        y=1.02,
+                        xanchor="right",
+                        x=1
+                    )
                 )
             )
             
@@ -1007,7 +1090,7 @@ def main():
             
             # Show ratio info
             if not dd_ship_display.empty and 'dd_ship_practice_ratio' in dd_ship_display.columns:
-                latest_ratio = dd_ship_display.iloc[-1]['dd_ship_practice_ratio']
+                latest_ratio = dd_ship_display['dd_ship_practice_ratio'].iat[-1]
                 if latest_ratio and latest_ratio != 'nan:nan:nan':
                     st.info(f"📊 Latest ratio: **{latest_ratio}** (Deep Dive : Practice : Shipping)")
 
@@ -1024,35 +1107,37 @@ def main():
         col1, col2 = st.columns([2, 1])
         
         with col1:
-            fig_progress = go.Figure()
-            
-            fig_progress.add_trace(go.Scatter(
-                x=progress_100_days['day_number'],
-                y=progress_100_days['day_number'],
-                mode='lines+markers',
-                name='Progress',
-                line=dict(color='#667eea', width=3),
-                marker=dict(size=8),
-                fill='tozeroy',
-                fillcolor='rgba(102, 126, 234, 0.1)'
-            ))
-            
-            # Add goal line
-            fig_progress.add_trace(go.Scatter(
-                x=[0, 100],
-                y=[0, 100],
-                mode='lines',
-                name='Goal',
-                line=dict(color='green', dash='dash', width=2)
-            ))
-            
-            fig_progress.update_layout(
-                title='Days Completed Over Time',
-                xaxis_title='Day Number',
-                yaxis_title='Progress',
-                height=400,
-                xaxis=dict(range=[0, 100]),
-                yaxis=dict(range=[0, 100])
+            fig_progress = go.Figure(
+                data=[go.Scatter(
+                    x=progress_100_days['day_number'],
+                    y=progress_100_days['day_number'],
+                    mode='lines+markers',
+                    name='Progress',
+                    line=dict(color='#667eea', width=3),
+                    marker=dict(size=8),
+                    fill='tozeroy',
+                    fillcolor='rgba(102, 126, 234, 0.1)'
+                )],
+                layout=dict(
+                    title='Days Completed Over Time',
+                    xaxis_title='Day Number',
+                    yaxis_title='Progress',
+                    height=400,
+                    xaxis=dict(range=[0, 100]),
+                    yaxis=dict(range=[0, 100]),
+                    # Goal line as a shape instead of a second trace
+                    shapes=[dict(
+                        type='line',
+                        x0=0, y0=0, x1=100, y1=100,
+                        line=dict(color='green', dash='dash', width=2)
+                    )],
+                    annotations=[dict(
+                        text='Goal',
+                        x=100, y=100, xanchor='right', yanchor='top',
+                        showarrow=False,
+                        font=dict(color='green')
+                    )]
+                )
             )
             
             st.plotly_chart(fig_progress, use_container_width=True)
@@ -1060,29 +1145,7 @@ def main():
         with col2:
             st.markdown("### 📊 Progress Stats")
             
-            # This calculates actual challenge days completed (excluding Sabbaths)
-            # Use a new query to ensure it's not cached
-            conn = get_database_connection()
-            if conn:
-                try:
-                    query = """
-                    SELECT COUNT(DISTINCT date) as days_completed
-                    FROM harvest_time_tracking
-                    WHERE date >= '2025-12-07'
-                      AND time_type IN ('CT', 'VT')
-                      AND day_of_week NOT IN ('Saturday')
-                    """
-                    days_df = pd.read_sql_query(query, conn)
-                    current_day = int(days_df['days_completed'].iloc[0]) if not days_df.empty else 0
-                    st.write(f"DEBUG: Query returned {current_day} days")  # Debug line
-                except Exception as e:
-                    st.error(f"Error calculating days: {e}")
-                    current_day = 0
-                finally:
-                    conn.close()
-            else:
-                current_day = 0
-            
+            # Actual challenge days completed (excluding Sabbaths), from the header
             days_remaining = 100 - current_day
             
             # Get total hours from weekly summary
@@ -1106,11 +1169,7 @@ def main():
     
     st.markdown("## 🎥 Video Production Breakdown")
     
-    if not vt_breakdown.empty:
-        # Aggregate by category
-        vt_by_category = vt_breakdown.groupby('vt_category')['hours'].sum().reset_index()
-        vt_by_category = vt_by_category.sort_values('hours', ascending=True)
-        
+    if not vt_by_category.empty:
         fig_vt = px.bar(
             vt_by_category,
             x='hours',
@@ -1168,43 +1227,7 @@ def main():
     def render_code_viewer(code, filename):
         st.markdown(f'<div class="code-header">📄 {filename}</div>', unsafe_allow_html=True)
         
-        code_lines = code.split('\n')
-        code_html = '<div class="code-editor" style="white-space: pre; font-family: \'Courier New\', monospace;">'
-        
-        for i, line in enumerate(code_lines, 1):
-            highlighted_line = line.replace('&', '&amp;').replace('<', '&lt;').replace('>', '&gt;')
-            
-            # Keywords
-            for keyword in ['def ', 'while ', 'if ', 'elif ', 'else:', 'break', 'return', 'True:', 'False', 'import ', 'from ', 'in ', 'not ']:
-                highlighted_line = highlighted_line.replace(keyword, f'<span class="keyword">{keyword}</span>')
-            
-            # Functions
-            for func in ['print(', 'input(', 'range(', 'len(', 'list(']:
-                highlighted_line = highlighted_line.replace(func, f'<span class="function">{func}</span>')
-            
-            # Methods
-            for method in ['.lower()', '.keys()', '.append(', '.isalpha()', '.choice(']:
-                highlighted_line = highlighted_line.replace(method, f'.<span class="function">{method[1:]}</span>')
-            
-            # Handle .join( and play_game()
-            highlighted_line = highlighted_line.replace('.join(', '.<span class="function">join</span>(')
-            highlighted_line = highlighted_line.replace('play_game()', '<span class="function">play_game</span>()')
-            
-            # Strings
-            import re
-            highlighted_line = re.sub(r'(".*?")', r'<span class="string">\1</span>', highlighted_line)
-            highlighted_line = re.sub(r"('.*?')", r'<span class="string">\1</span>', highlighted_line)
-            
-            # Comments
-            if '#' in highlighted_line and '<span' not in highlighted_line.split('#')[-1]:
-                parts = highlighted_line.split('#', 1)
-                if len(parts) == 2:
-                    highlighted_line = parts[0] + '<span class="comment">#' + parts[1] + '</span>'
-            
-            code_html += f'<div style="display: flex;"><span class="line-number">{i:>3}</span><span>{highlighted_line}</span></div>'
-        
-        code_html += '</div>'
-        st.markdown(code_html, unsafe_allow_html=True)
+        st.markdown(highlight_code(code), unsafe_allow_html=True)
     
     # Create tabs for each file
     tab1, tab2, tab3 = st.tabs([